@@ -0,0 +1,68 @@
+# cython: language_level=3
+"""
+Compiled dictionary term scans for the clinical extractors
+Build in place with: cythonize -i _scan.pyx
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+
+
+cdef inline bint _is_word_char(Py_UCS4 char):
+    """Same notion of a word character as the regex \\w class"""
+    return char == u'_' or char.isalnum()
+
+
+def scan_report(str text_lower, object automaton):
+    """Find whole-word dictionary terms with an Aho-Corasick automaton
+
+    The automaton values are (key length, ((category, term), ...)) as
+    built by the extractors. Returns a defaultdict of category -> set of terms.
+    """
+    hits = defaultdict(set)
+    cdef Py_ssize_t last = len(text_lower) - 1
+    cdef Py_ssize_t end, start, length
+    cdef tuple entries
+
+    for end, (length, entries) in automaton.iter(text_lower):
+        start = end - length + 1
+        # Enforce word boundaries on both sides of the hit
+        if start > 0 and _is_word_char(text_lower[start - 1]):
+            continue
+        if end < last and _is_word_char(text_lower[end + 1]):
+            continue
+        for category, term in entries:
+            hits[category].add(term)
+    return hits
+
+
+def scan_reports(list reports_lower, object automaton):
+    """Scan several lowercased reports with one automaton pass over all of them
+
+    The reports are joined with newlines, which are never part of a term,
+    and each hit is assigned to its report by its start offset. Returns one
+    defaultdict of category -> set of terms per report.
+    """
+    cdef list starts = [0]
+    cdef Py_ssize_t offset = 0
+    for report_lower in reports_lower[:-1]:
+        offset += len(<str>report_lower) + 1
+        starts.append(offset)
+    cdef str corpus = "\n".join(reports_lower)
+
+    report_hits = [defaultdict(set) for _ in reports_lower]
+    cdef Py_ssize_t last = len(corpus) - 1
+    cdef Py_ssize_t end, start, length
+    cdef tuple entries
+
+    for end, (length, entries) in automaton.iter(corpus):
+        start = end - length + 1
+        # Enforce word boundaries on both sides of the hit
+        if start > 0 and _is_word_char(corpus[start - 1]):
+            continue
+        if end < last and _is_word_char(corpus[end + 1]):
+            continue
+        hits = report_hits[bisect_right(starts, start) - 1]
+        for category, term in entries:
+            hits[category].add(term)
+    return report_hits
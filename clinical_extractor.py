@@ -4,27 +4,97 @@ Clinical Information Extraction from Medical Reports
 Uses traditional NLP/ML/NER methods to extract structured data from medical PDFs
 """
 
+import codecs
 import json
+import os
 import re
+import sys
 import spacy
 import pandas as pd
-from typing import List, Dict, Any
-from dataclasses import dataclass
+from typing import List, Dict, Any, Set, Optional, Iterator, Tuple
+from dataclasses import dataclass, asdict, replace
+from hashlib import blake2b
+from tempfile import NamedTemporaryFile
 from collections import defaultdict
-import PyPDF2
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from itertools import chain, islice, repeat
 from pathlib import Path
 
+try:
+    import pymupdf as fitz  # PyMuPDF
+except ImportError:
+    import fitz  # PyMuPDF before 1.24.3
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+try:
+    # Cython build of the Aho-Corasick scan loop (cythonize -i _scan.pyx)
+    from _scan import scan_report
+    COMPILED_SCAN_AVAILABLE = True
+except ImportError:
+    COMPILED_SCAN_AVAILABLE = False
+
+# Only doc.ents is used, so everything except NER is left out of the pipeline
+UNUSED_PIPES = ["tagger", "parser", "lemmatizer", "attribute_ruler", "senter"]
+
+def _load_ner_model(name: str):
+    """Load a spaCy model with only the components NER depends on"""
+    model = spacy.load(name, disable=UNUSED_PIPES)
+    # The shared tok2vec is only needed when the NER component listens to it
+    if "tok2vec" in model.pipe_names and "ner" not in model.get_pipe("tok2vec").listening_components:
+        model.disable_pipe("tok2vec")
+    return model
+
 # Try to load the medical model, fallback to en_core_web_sm if not available
 try:
-    nlp = spacy.load("en_core_sci_sm")  # ScispaCy model for medical text
+    nlp = _load_ner_model("en_core_sci_sm")  # ScispaCy model for medical text
 except OSError:
     try:
-        nlp = spacy.load("en_core_web_sm")
+        nlp = _load_ner_model("en_core_web_sm")
         print("Warning: Using general English model. Install en_core_sci_sm for better medical NER")
     except OSError:
         print("Error: No spaCy model found. Please install with: python -m spacy download en_core_web_sm")
         nlp = None
 
+# Bump to invalidate cached extraction results after changing the extractors
+CACHE_VERSION = 1
+
+# Inflections accepted after a dictionary term
+TERM_SUFFIXES = ('s', 'es', 'ies')
+LOCATION_SUFFIXES = ('al', 'ic', 'ine', 'ar')
+
+def _is_word_char(char: str) -> bool:
+    """Same notion of a word character as the regex \\w class"""
+    return char.isalnum() or char == '_'
+
+def _ascii_word_class(error):
+    """Encoding error handler that keeps the word/non-word class of non-ASCII characters
+    
+    Hyperscan's \\b only knows ASCII word characters. Replacing each
+    non-ASCII character with 'x' or ' ' keeps word boundaries where re puts
+    them, and one byte per character.
+    """
+    chunk = error.object[error.start:error.end]
+    return ''.join('x' if _is_word_char(char) else ' ' for char in chunk), error.end
+
+codecs.register_error('ascii_word_class', _ascii_word_class)
+
+def _extract_page(pdf_path: str, page_num: int) -> str:
+    """Extract text from a single PDF page (process pool worker)"""
+    with fitz.open(pdf_path) as doc:
+        return doc[page_num].get_text("text")
+
 @dataclass
 class ClinicalReport:
     """Structure to hold extracted clinical information"""
@@ -41,8 +111,16 @@ class ClinicalReport:
 class ClinicalExtractor:
     """Main class for extracting clinical information from medical reports"""
     
-    def __init__(self):
+    def __init__(self, threads: int = 1, cache_dir: Optional[str] = None):
         self.nlp = nlp
+        self.threads = threads  # worker processes for PDF pages and NER
+        
+        # Optional on-disk cache of results keyed by report content
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        if self._cache_dir:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            model = f"{nlp.meta['name']}-{nlp.meta['version']}" if nlp else "no-model"
+            self._cache_prefix = f"v{CACHE_VERSION}:{model}:"
         self._load_medical_dictionaries()
         self._compile_patterns()
     
@@ -82,6 +160,167 @@ class ClinicalExtractor:
             'appendix', 'liver', 'gallbladder', 'pancreas', 'spleen', 'peritoneum',
             'mucosa', 'submucosa', 'muscularis', 'serosa', 'lumen', 'wall'
         ]
+        
+        # Freeze the dictionaries into lowercase, deduplicated tuples
+        self.medical_terms = {category: self._freeze_terms(terms) for category, terms in self.medical_terms.items()}
+        self.anatomical_locations = self._freeze_terms(self.anatomical_locations)
+        self._all_terms_by_cat = {category: frozenset(terms) for category, terms in self.medical_terms.items()}
+        
+        self._last_scan = (None, None)
+    
+    @staticmethod
+    def _freeze_terms(terms) -> tuple:
+        """Lowercase, deduplicate and intern terms, longest first (ties alphabetical)
+        
+        Interned terms are shared by every result that reports them.
+        """
+        return tuple(sorted({sys.intern(term.lower()) for term in terms}, key=lambda term: (-len(term), term)))
+    
+    def _term_dictionaries(self):
+        """Return (category, terms, suffixes) for every dictionary scanned for terms"""
+        dictionaries = [(category, terms, TERM_SUFFIXES) for category, terms in self.medical_terms.items()]
+        dictionaries.append(('anatomical', self.anatomical_locations, LOCATION_SUFFIXES))
+        return dictionaries
+    
+    @staticmethod
+    def _term_surfaces(terms, suffixes) -> Dict[str, Set[str]]:
+        """Map every accepted surface form to the dictionary terms it stands for"""
+        surfaces = defaultdict(set)
+        for term in terms:
+            for suffix in ('',) + suffixes:
+                surfaces[term + suffix].add(term)
+        return surfaces
+    
+    def _build_term_automaton(self):
+        """Build one Aho-Corasick automaton over all dictionary terms
+        
+        Every term is added together with its suffixed variants. A value
+        holds the key length and the (category, term) pairs it stands for.
+        """
+        entries = defaultdict(set)
+        for category, terms, suffixes in self._term_dictionaries():
+            for surface, surface_terms in self._term_surfaces(terms, suffixes).items():
+                entries[surface].update((category, term) for term in surface_terms)
+        
+        automaton = ahocorasick.Automaton()
+        for surface, surface_entries in entries.items():
+            automaton.add_word(surface, (len(surface), tuple(surface_entries)))
+        automaton.make_automaton()
+        return automaton
+    
+    def _build_term_database(self):
+        """Compile every dictionary term into one Hyperscan database
+        
+        Returns the database and the (category, term) pair for each pattern id.
+        """
+        db_entries = []
+        expressions = []
+        for category, terms, suffixes in self._term_dictionaries():
+            suffix_group = '(?:' + '|'.join(suffixes) + ')?'
+            for term in terms:
+                db_entries.append((category, term))
+                expressions.append((r'\b' + re.escape(term) + suffix_group + r'\b').encode())
+        
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions)
+        )
+        return database, db_entries
+    
+    def _build_term_regex(self):
+        """Compile one alternation over the surface forms of every category
+        
+        The alternation sits in a lookahead so every word start is tried,
+        and nested terms ("abdominal pain", "pain") are all found. Only the
+        longest surface matches at a given start, so each surface also
+        carries the (category, term) pairs of its shorter whole-word prefixes.
+        """
+        surfaces = defaultdict(set)
+        for category, terms, suffixes in self._term_dictionaries():
+            for surface, surface_terms in self._term_surfaces(terms, suffixes).items():
+                surfaces[surface].update((category, term) for term in surface_terms)
+        
+        closed = {}
+        for surface, surface_entries in surfaces.items():
+            entries = set(surface_entries)
+            for i in range(1, len(surface)):
+                if not _is_word_char(surface[i]) and surface[:i] in surfaces:
+                    entries.update(surfaces[surface[:i]])
+            closed[surface] = tuple(entries)
+        
+        alternation = '|'.join(re.escape(surface) for surface in sorted(surfaces, key=len, reverse=True))
+        return re.compile(r'\b(?=(' + alternation + r')\b)'), closed
+    
+    def _scan_terms(self, text_lower: str) -> Dict[str, Set[str]]:
+        """Find whole-word dictionary terms in the lowercased text, grouped by category
+        
+        The result for the most recent string is kept, so the extractors that
+        process_report calls with the same ``text_lower`` share a single scan.
+        """
+        last_text, last_hits = self._last_scan
+        if text_lower is last_text:
+            return last_hits
+        
+        hits = self._term_scanner(text_lower)
+        self._last_scan = (text_lower, hits)
+        return hits
+    
+    def _make_term_scanner(self):
+        """Return a scan function specialized for the available backend
+        
+        The backend is picked once here, and the database, automaton or regex
+        and its lookup tables are bound into the returned closure, so a scan
+        does no backend dispatch or attribute lookups. Hyperscan comes first:
+        it scans about 4x faster than Aho-Corasick, even with the compiled
+        scan loop.
+        """
+        if HYPERSCAN_AVAILABLE:
+            database, db_entries = self._build_term_database()
+            
+            def scan_hyperscan(text_lower):
+                hits = defaultdict(set)
+                
+                def on_match(term_id, start, end, flags, context):
+                    category, term = db_entries[term_id]
+                    hits[category].add(term)
+                
+                database.scan(text_lower.encode('ascii', 'ascii_word_class'), match_event_handler=on_match)
+                return hits
+            return scan_hyperscan
+        
+        if AHOCORASICK_AVAILABLE:
+            automaton = self._build_term_automaton()
+            if COMPILED_SCAN_AVAILABLE:
+                return lambda text_lower: scan_report(text_lower, automaton)
+            
+            def scan_ac(text_lower):
+                hits = defaultdict(set)
+                last = len(text_lower) - 1
+                for end, (length, entries) in automaton.iter(text_lower):
+                    start = end - length + 1
+                    # Enforce word boundaries on both sides of the hit
+                    if start > 0 and _is_word_char(text_lower[start - 1]):
+                        continue
+                    if end < last and _is_word_char(text_lower[end + 1]):
+                        continue
+                    for category, term in entries:
+                        hits[category].add(term)
+                return hits
+            return scan_ac
+        
+        findall, surfaces = self._build_term_regex()
+        findall = findall.findall
+        
+        def scan_re(text_lower):
+            hits = defaultdict(set)
+            for surface in set(findall(text_lower)):
+                for category, term in surfaces[surface]:
+                    hits[category].add(term)
+            return hits
+        return scan_re
     
     def _compile_patterns(self):
         """Compile regex patterns for code extraction"""
@@ -89,159 +328,180 @@ class ClinicalExtractor:
         # ICD-10 pattern: Letter + 2 digits + optional dot + optional 1-2 digits/letters
         self.icd10_pattern = re.compile(r'\b[A-Z]\d{2}(?:\.\d{1,2}[A-Z]?)?\b')
         
-        # CPT pattern: 5 digits, potentially with modifiers
-        self.cpt_pattern = re.compile(r'\b\d{5}\b')
+        # CPT pattern: 5 digits in the 10000-99999 range (no leading zero)
+        self.cpt_pattern = re.compile(r'\b[1-9]\d{4}\b')
         
         # HCPCS pattern: Letter + 4 digits
         self.hcpcs_pattern = re.compile(r'\b[A-Z]\d{4}\b')
         
-        # Modifier pattern: 2 digits or 2 letters
-        self.modifier_pattern = re.compile(r'\b(?:modifier\s+)?([A-Z]{2}|\d{2})\b', re.IGNORECASE)
+        # Modifier pattern: 2 letters or digits after the word "modifier"
+        self.modifier_pattern = re.compile(r'\bmodifiers?:?\s+([A-Z0-9]{2})\b', re.IGNORECASE)
         
-        # Diagnosis section patterns
+        # All of the above in one pass, one named group per code type. Only the
+        # modifier branch ignores case, as in the individual patterns
+        self._codes_re = re.compile(
+            r'\b(?:(?P<icd_10>[A-Z]\d{2}(?:\.\d{1,2}[A-Z]?)?)'
+            r'|(?P<cpt>[1-9]\d{4})'
+            r'|(?P<hcpcs>[A-Z]\d{4})'
+            r'|(?i:modifiers?:?\s+(?P<modifiers>[A-Z0-9]{2})))\b'
+        )
+        
+        # Diagnosis section patterns. A section runs up to a blank line or the next
+        # heading; lines are consumed one at a time with a lookahead, avoiding
+        # lazy .*? backtracking
         self.diagnosis_patterns = [
-            re.compile(r'(?:diagnosis|impression|findings?):\s*(.*?)(?:\n\n|\nPROCEDURE|\nRECOMMENDATIONS?|\nPLAN|\Z)', re.IGNORECASE | re.DOTALL),
-            re.compile(r'(?:primary|secondary|final)\s+diagnosis:\s*(.*?)(?:\n\n|\n[A-Z]+:|\Z)', re.IGNORECASE | re.DOTALL)
+            re.compile(r'(?:diagnosis|impression|findings?):\s*((?:[^\n]+|\n(?!\n|PROCEDURE|RECOMMENDATIONS?|PLAN))*)', re.IGNORECASE),
+            re.compile(r'(?:primary|secondary|final)\s+diagnosis:\s*((?:[^\n]+|\n(?!\n|[A-Z]+:))*)', re.IGNORECASE)
         ]
         
         # Procedure section patterns
         self.procedure_patterns = [
-            re.compile(r'(?:procedure|procedure\s+performed):\s*(.*?)(?:\n\n|\nDIAGNOSIS|\nFINDINGS?|\nIMPRESSION|\Z)', re.IGNORECASE | re.DOTALL),
-            re.compile(r'(?:endoscopic|surgical)\s+procedure:\s*(.*?)(?:\n\n|\n[A-Z]+:|\Z)', re.IGNORECASE | re.DOTALL)
+            re.compile(r'(?:procedure|procedure\s+performed):\s*((?:[^\n]+|\n(?!\n|DIAGNOSIS|FINDINGS?|IMPRESSION))*)', re.IGNORECASE),
+            re.compile(r'(?:endoscopic|surgical)\s+procedure:\s*((?:[^\n]+|\n(?!\n|[A-Z]+:))*)', re.IGNORECASE)
+        ]
+        
+        # Report separators in priority order. Each one starts at a newline, so
+        # they are combined behind a single \n and probed with a lookahead at
+        # every line break; the named group tells which separator matched
+        separators = [
+            r'\s*Report\s+\d+',
+            r'\s*REPORT\s+\d+',
+            r'\s*Case\s+\d+',
+            r'\s*Patient\s+\d+',
+            r'\s*Date:.*?\n.*?Name:',
+            r'\s*\d+\.\s*(?:Patient|Report)',
+            r'\s*-{3,}\s*\n',  # Multiple dashes
+            r'\s*={3,}\s*\n'   # Multiple equals signs
         ]
+        self._separator_re = re.compile(
+            r'\n(?=' + '|'.join(f'(?P<sep{i}>{pattern})' for i, pattern in enumerate(separators)) + ')',
+            re.IGNORECASE
+        )
+        self._blank_triple = re.compile(r'\n\s*\n\s*\n')
+        
+        # Text cleanup patterns
+        self._whitespace_re = re.compile(r'\s+')
+        self._diagnosis_split_re = re.compile(r'[;\n]|(?:\d+\.)')
+        
+        # Dictionary term scanner for the available backend
+        self._term_scanner = self._make_term_scanner()
     
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text from PDF file"""
         try:
-            text = ""
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text
+            with fitz.open(pdf_path) as doc:
+                page_count = doc.page_count
+                if self.threads <= 1 or page_count <= 1:
+                    return "\n".join(page.get_text("text") for page in doc)
+            
+            # Pages are parsed independently; only the path and page index
+            # are sent to the workers
+            with ProcessPoolExecutor(max_workers=min(self.threads, page_count)) as pool:
+                pages = pool.map(_extract_page, repeat(pdf_path), range(page_count))
+                return "\n".join(pages)
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
             return ""
     
-    def split_reports(self, text: str) -> List[str]:
-        """Split the text into individual reports"""
-        # Common patterns that separate reports
-        separators = [
-            r'\n\s*Report\s+\d+',
-            r'\n\s*REPORT\s+\d+',
-            r'\n\s*Case\s+\d+',
-            r'\n\s*Patient\s+\d+',
-            r'\n\s*Date:.*?\n.*?Name:',
-            r'\n\s*\d+\.\s*(?:Patient|Report)',
-            r'\n\s*-{3,}\s*\n',  # Multiple dashes
-            r'\n\s*={3,}\s*\n'   # Multiple equals signs
-        ]
-        
-        # Try each separator pattern
-        for pattern in separators:
-            reports = re.split(pattern, text, flags=re.IGNORECASE)
-            if len(reports) > 1:
-                # Clean up reports
-                cleaned_reports = []
-                for i, report in enumerate(reports):
-                    if report.strip():
-                        # Add back the separator info for context
-                        report_id = f"Report {i+1}"
-                        cleaned_reports.append(report.strip())
-                return cleaned_reports
+    def iter_reports(self, text: str) -> Iterator[str]:
+        """Yield the individual reports in the text one at a time"""
+        # Find every separator in one pass, grouped by separator type
+        hits = defaultdict(list)
+        for match in self._separator_re.finditer(text):
+            hits[match.lastgroup].append((match.start(), match.end(match.lastgroup)))
+        
+        if hits:
+            # The highest-priority separator present wins, as if each were tried in turn
+            separator = min(hits, key=self._separator_re.groupindex.get)
+            last_end = 0
+            for start, end in hits[separator]:
+                if start >= last_end:  # Skip overlapping hits, as re.split would
+                    report = text[last_end:start].strip()
+                    if report:
+                        yield report
+                    last_end = end
+            report = text[last_end:].strip()
+            if report:
+                yield report
+            return
         
         # If no clear separators found, try to split by page breaks or large gaps
-        reports = re.split(r'\n\s*\n\s*\n', text)
+        reports = self._blank_triple.split(text)
         if len(reports) >= 4:  # Expecting 4 reports
-            return [report.strip() for report in reports if report.strip()]
+            yield from (report.strip() for report in reports if report.strip())
+            return
         
         # Fallback: assume the entire text is one report or split by length
         if len(text) > 1000:
             # Simple length-based splitting for 4 reports
             length = len(text) // 4
-            reports = []
             for i in range(4):
                 start = i * length
                 end = (i + 1) * length if i < 3 else len(text)
-                reports.append(text[start:end].strip())
-            return reports
+                yield text[start:end].strip()
+            return
         
-        return [text]  # Single report
+        yield text  # Single report
+    
+    def split_reports(self, text: str) -> List[str]:
+        """Split the text into individual reports"""
+        return list(self.iter_reports(text))
     
     def extract_medical_codes(self, text: str) -> Dict[str, List[str]]:
         """Extract ICD-10, CPT, HCPCS codes and modifiers"""
-        codes = {
-            'icd_10': [],
-            'cpt': [],
-            'hcpcs': [],
-            'modifiers': []
+        buckets = {
+            'icd_10': set(),
+            'cpt': set(),
+            'hcpcs': set(),
+            'modifiers': set()
         }
         
-        # Extract ICD-10 codes
-        icd10_matches = self.icd10_pattern.findall(text)
-        codes['icd_10'] = list(set(icd10_matches))
+        # Single pass over the text; the named group says which code type matched
+        for match in self._codes_re.finditer(text):
+            buckets[match.lastgroup].add(match.group(match.lastgroup))
         
-        # Extract CPT codes
-        cpt_matches = self.cpt_pattern.findall(text)
-        # Filter out codes that are clearly not CPT (like years, etc.)
-        valid_cpt = [code for code in cpt_matches if 10000 <= int(code) <= 99999]
-        codes['cpt'] = list(set(valid_cpt))
-        
-        # Extract HCPCS codes
-        hcpcs_matches = self.hcpcs_pattern.findall(text)
-        codes['hcpcs'] = list(set(hcpcs_matches))
-        
-        # Extract modifiers
-        modifier_matches = self.modifier_pattern.findall(text)
-        codes['modifiers'] = list(set(modifier_matches))
-        
-        return codes
+        return {code_type: sorted(found) for code_type, found in buckets.items()}
     
-    def extract_clinical_terms(self, text: str) -> List[str]:
-        """Extract clinical terms using NER and pattern matching"""
+    def extract_clinical_terms(self, text: str, doc=None, text_lower: Optional[str] = None) -> List[str]:
+        """Extract clinical terms using NER and pattern matching
+        
+        ``doc`` is an already parsed spaCy Doc of the lowercased text; when
+        omitted the text is parsed here. ``text_lower`` is ``text.lower()``
+        if the caller already has it.
+        """
         clinical_terms = set()
+        if text_lower is None:
+            text_lower = text.lower()
         
         # Use spaCy NER if available
-        if self.nlp:
-            doc = self.nlp(text.lower())
+        if doc is None and self.nlp:
+            doc = self.nlp(text_lower)
+        if doc is not None:
             for ent in doc.ents:
                 if ent.label_ in ['DISEASE', 'SYMPTOM', 'TREATMENT', 'MEDICAL_CONDITION']:
-                    clinical_terms.add(ent.text)
+                    clinical_terms.add(sys.intern(ent.text))
         
         # Pattern-based extraction using medical dictionaries
-        text_lower = text.lower()
-        
-        for category, terms in self.medical_terms.items():
-            for term in terms:
-                if term in text_lower:
-                    clinical_terms.add(term)
-                    
-                # Also check for partial matches and variations
-                pattern = re.compile(r'\b' + re.escape(term) + r'(?:s|es|ies)?\b', re.IGNORECASE)
-                matches = pattern.findall(text)
-                clinical_terms.update([match.lower() for match in matches])
+        hits = self._scan_terms(text_lower)
+        for category in self.medical_terms:
+            clinical_terms.update(hits[category])
         
         return list(clinical_terms)
     
-    def extract_anatomical_locations(self, text: str) -> List[str]:
+    def extract_anatomical_locations(self, text: str, text_lower: Optional[str] = None) -> List[str]:
         """Extract anatomical locations"""
-        locations = set()
-        text_lower = text.lower()
-        
-        for location in self.anatomical_locations:
-            if location in text_lower:
-                locations.add(location)
-                
-            # Check for variations and partial matches
-            pattern = re.compile(r'\b' + re.escape(location) + r'(?:al|ic|ine|ar)?\b', re.IGNORECASE)
-            matches = pattern.findall(text)
-            if matches:
-                locations.add(location)
-        
+        if text_lower is None:
+            text_lower = text.lower()
+        locations = self._scan_terms(text_lower)['anatomical']
         return list(locations)
     
-    def extract_diagnosis(self, text: str) -> List[str]:
-        """Extract diagnosis information"""
+    def extract_diagnosis(self, text: str, clinical_terms: Optional[List[str]] = None) -> List[str]:
+        """Extract diagnosis information
+        
+        ``clinical_terms`` is the output of ``extract_clinical_terms`` for the
+        same text; it is only computed here if the fallback needs it and it
+        was not passed in.
+        """
         diagnoses = []
         
         # Look for diagnosis sections
@@ -249,10 +509,10 @@ class ClinicalExtractor:
             matches = pattern.findall(text)
             for match in matches:
                 # Clean up the diagnosis text
-                diagnosis_text = re.sub(r'\s+', ' ', match.strip())
+                diagnosis_text = self._whitespace_re.sub(' ', match.strip())
                 if diagnosis_text:
                     # Split multiple diagnoses
-                    diagnosis_list = re.split(r'[;\n]|(?:\d+\.)', diagnosis_text)
+                    diagnosis_list = self._diagnosis_split_re.split(diagnosis_text)
                     for diag in diagnosis_list:
                         diag = diag.strip().rstrip('.')
                         if len(diag) > 5:  # Filter out very short entries
@@ -260,46 +520,97 @@ class ClinicalExtractor:
         
         # If no structured diagnosis found, extract from clinical terms
         if not diagnoses:
-            clinical_terms = self.extract_clinical_terms(text)
-            condition_terms = [term for term in clinical_terms 
-                             if any(cond in term for cond in self.medical_terms.get('gastrointestinal', []))]
+            if clinical_terms is None:
+                clinical_terms = self.extract_clinical_terms(text)
+            conditions = self._all_terms_by_cat['gastrointestinal']
+            # Dictionary hits are found by set lookup; only NER phrases need the substring test
+            condition_terms = [term for term in clinical_terms
+                             if term in conditions or any(cond in term for cond in conditions)]
             diagnoses = condition_terms[:3]  # Limit to top 3
         
         return list(set(diagnoses))
     
-    def extract_procedures(self, text: str) -> List[str]:
+    def extract_procedures(self, text: str, text_lower: Optional[str] = None) -> List[str]:
         """Extract procedure information"""
         procedures = []
+        if text_lower is None:
+            text_lower = text.lower()
         
         # Look for procedure sections
         for pattern in self.procedure_patterns:
             matches = pattern.findall(text)
             for match in matches:
-                procedure_text = re.sub(r'\s+', ' ', match.strip())
+                procedure_text = self._whitespace_re.sub(' ', match.strip())
                 if procedure_text:
                     procedures.append(procedure_text)
         
         # Also extract known procedures from text
-        text_lower = text.lower()
-        for procedure in self.medical_terms.get('procedures', []):
-            if procedure in text_lower:
-                procedures.append(procedure)
+        procedures.extend(self._scan_terms(text_lower)['procedures'])
         
         return list(set(procedures))
     
-    def process_report(self, report_text: str, report_id: str) -> ClinicalReport:
-        """Process a single report and extract all information"""
+    def _cache_path(self, report_text: str) -> Optional[Path]:
+        """Location of the cached result for a report, if caching is enabled"""
+        if not self._cache_dir:
+            return None
+        key = blake2b((self._cache_prefix + report_text).encode('utf-8'), digest_size=16).hexdigest()
+        return self._cache_dir / f"{key}.json"
+    
+    def _load_cached_report(self, report_text: str) -> Optional[ClinicalReport]:
+        """Return the cached result for a report, or None on a cache miss"""
+        cache_path = self._cache_path(report_text)
+        if cache_path is None:
+            return None
+        try:
+            return ClinicalReport(**json.loads(cache_path.read_text(encoding='utf-8')))
+        except (OSError, ValueError, TypeError):
+            return None  # Missing or unreadable entry, recompute it
+    
+    def _store_cached_report(self, report_text: str, clinical_report: ClinicalReport):
+        """Cache the result for a report, if caching is enabled
+        
+        The entry is written to a temporary file and moved into place, so
+        readers never see a partial entry. The cache is only an optimization:
+        if it cannot be written, the result is simply not cached.
+        """
+        cache_path = self._cache_path(report_text)
+        if cache_path is None:
+            return
+        tmp_path = None
+        try:
+            with NamedTemporaryFile('w', encoding='utf-8', dir=self._cache_dir,
+                                    suffix='.tmp', delete=False) as tmp:
+                tmp_path = tmp.name
+                json.dump(asdict(clinical_report), tmp)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Could not cache {clinical_report.report_id}: {e}")
+            if tmp_path is not None:
+                with suppress(OSError):
+                    os.unlink(tmp_path)
+    
+    def process_report(self, report_text: str, report_id: str, doc=None) -> ClinicalReport:
+        """Process a single report and extract all information
+        
+        ``doc`` is the spaCy Doc of the lowercased report, e.g. from
+        ``nlp.pipe`` in ``process_pdf``.
+        """
+        
+        cached = self._load_cached_report(report_text)
+        if cached is not None:
+            return replace(cached, report_id=report_id)
         
         # Extract medical codes
         codes = self.extract_medical_codes(report_text)
         
-        # Extract clinical information
-        clinical_terms = self.extract_clinical_terms(report_text)
-        anatomical_locations = self.extract_anatomical_locations(report_text)
-        diagnosis = self.extract_diagnosis(report_text)
-        procedures = self.extract_procedures(report_text)
+        # Extract clinical information, lowercasing the report only once
+        text_lower = report_text.lower()
+        clinical_terms = self.extract_clinical_terms(report_text, doc, text_lower)
+        anatomical_locations = self.extract_anatomical_locations(report_text, text_lower)
+        diagnosis = self.extract_diagnosis(report_text, clinical_terms)
+        procedures = self.extract_procedures(report_text, text_lower)
         
-        return ClinicalReport(
+        clinical_report = ClinicalReport(
             report_id=report_id,
             clinical_terms=clinical_terms,
             anatomical_locations=anatomical_locations,
@@ -310,49 +621,115 @@ class ClinicalExtractor:
             hcpcs=codes['hcpcs'],
             modifiers=codes['modifiers']
         )
+        
+        self._store_cached_report(report_text, clinical_report)
+        return clinical_report
     
-    def process_pdf(self, pdf_path: str) -> List[Dict[str, Any]]:
-        """Process the entire PDF and return structured JSON for all reports"""
+    def _iter_parsed_reports(self, text: str) -> Iterator[Tuple[str, str, Any, Optional[ClinicalReport]]]:
+        """Yield (report_id, report_text, doc, cached) for each report, running NER in batches
+        
+        ``cached`` is the report's cached result, if it was found while
+        batching; such reports are not parsed and their ``doc`` is None.
+        """
+        def numbered():
+            return ((f"Report {i+1}", report) for i, report in enumerate(self.iter_reports(text)))
+        
+        reports = numbered()
+        if not self.nlp:
+            for report_id, report_text in reports:
+                yield report_id, report_text, None, None
+            return
+        
+        def pipe_input():
+            for report_id, report_text in reports:
+                # Cached reports skip NER; an empty text keeps them in order. An
+                # unreadable entry is a miss, so the report still gets parsed
+                cached = self._load_cached_report(report_text)
+                yield ("" if cached is not None else report_text.lower()), (report_id, report_text, cached)
+        
+        # Buffer enough reports for every worker to get a full batch. A shorter
+        # PDF is then known in full, and gets no more workers than it has
+        # reports to parse and batches small enough to reach all of them
+        items = pipe_input()
+        workers = max(1, self.threads)
+        head = list(islice(items, workers * 16))
+        if len(head) < workers * 16:
+            pending = sum(1 for report_lower, _ in head if report_lower)
+            workers = max(1, min(workers, pending))
+            batch_size = max(1, min(16, -(-pending // workers)))
+        else:
+            batch_size = 16
+        
+        docs = self.nlp.pipe(chain(head, items), as_tuples=True, batch_size=batch_size, n_process=workers)
+        done = 0
+        try:
+            for doc, (report_id, report_text, cached) in docs:
+                # A cached report goes on with the result loaded above, never with
+                # its empty Doc, so it does not depend on the entry still existing
+                yield report_id, report_text, (None if cached is not None else doc), cached
+                done += 1
+        except Exception as e:
+            # One report that breaks spaCy takes its whole batch down with it.
+            # Hand the rest over without a doc, so process_report runs NER on
+            # each alone and only the failing report is skipped
+            print(f"Error running NER on batch: {e}")
+            for report_id, report_text in islice(numbered(), done, None):
+                yield report_id, report_text, None, None
+    
+    def iter_results(self, pdf_path: str) -> Iterator[Dict[str, Any]]:
+        """Process the PDF one report at a time, yielding structured JSON for each
+        
+        Only the reports in the current NER batch are held in memory, not a
+        list of every report and result.
+        """
         
         # Extract text from PDF
         full_text = self.extract_text_from_pdf(pdf_path)
         if not full_text:
             print("No text extracted from PDF")
-            return []
+            return
         
-        # Split into individual reports
-        reports = self.split_reports(full_text)
-        print(f"Found {len(reports)} reports")
-        
-        # Process each report
-        results = []
-        for i, report_text in enumerate(reports):
-            report_id = f"Report {i+1}"
-            
+        # Process each report as it is split off
+        for report_id, report_text, doc, cached in self._iter_parsed_reports(full_text):
             try:
-                clinical_report = self.process_report(report_text, report_id)
-                
-                # Convert to required JSON format
-                result = {
-                    "ReportID": clinical_report.report_id,
-                    "Clinical Terms": clinical_report.clinical_terms,
-                    "Anatomical Locations": clinical_report.anatomical_locations,
-                    "Diagnosis": clinical_report.diagnosis,
-                    "Procedures": clinical_report.procedures,
-                    "ICD-10": clinical_report.icd_10,
-                    "CPT": clinical_report.cpt,
-                    "HCPCS": clinical_report.hcpcs,
-                    "Modifiers": clinical_report.modifiers
-                }
-                
-                results.append(result)
-                print(f"Processed {report_id}")
-                
+                if cached is not None:
+                    clinical_report = replace(cached, report_id=report_id)
+                else:
+                    clinical_report = self.process_report(report_text, report_id, doc)
             except Exception as e:
                 print(f"Error processing {report_id}: {e}")
                 continue
-        
-        return results
+            
+            print(f"Processed {report_id}")
+            
+            # Convert to required JSON format
+            yield {
+                "ReportID": clinical_report.report_id,
+                "Clinical Terms": clinical_report.clinical_terms,
+                "Anatomical Locations": clinical_report.anatomical_locations,
+                "Diagnosis": clinical_report.diagnosis,
+                "Procedures": clinical_report.procedures,
+                "ICD-10": clinical_report.icd_10,
+                "CPT": clinical_report.cpt,
+                "HCPCS": clinical_report.hcpcs,
+                "Modifiers": clinical_report.modifiers
+            }
+    
+    def process_pdf(self, pdf_path: str) -> List[Dict[str, Any]]:
+        """Process the entire PDF and return structured JSON for all reports"""
+        return list(self.iter_results(pdf_path))
+    
+    def process_pdf_to_jsonl(self, pdf_path: str, output_path: str) -> int:
+        """Stream results to a JSON Lines file as reports are processed
+        
+        Returns the number of reports written.
+        """
+        count = 0
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for result in self.iter_results(pdf_path):
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+                count += 1
+        return count
 
 def main():
     """Main function to run the clinical extraction"""
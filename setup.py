@@ -50,14 +50,22 @@ def main():
         # Try installing packages individually
         packages = [
             "spacy>=3.4.0",
-            "PyPDF2>=3.0.0", 
+            "pymupdf>=1.23",
+            "pypdfium2>=4.0",
+            "PyPDF2>=3.0.0",
             "pandas>=1.5.0",
+            "pyahocorasick>=2.0",
             "scispacy>=0.5.1"
         ]
         
         for package in packages:
             run_command(f"pip install {package}", f"Installing {package}")
     
+    # Build the optional compiled term scanner; the pure Python scan is used if this fails
+    print("\n⚙️  Building compiled term scanner...")
+    if run_command("pip install cython", "Installing Cython"):
+        run_command("cythonize -i _scan.pyx", "Compiling _scan.pyx")
+    
     # Download spaCy models
     print("\n🔤 Downloading spaCy language models...")
     
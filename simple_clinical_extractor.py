@@ -4,19 +4,241 @@ Simplified Clinical Information Extraction System
 Works with basic Python libraries to avoid dependency conflicts
 """
 
+import codecs
 import json
 import re
 import sys
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set, Optional, Iterator
 from dataclasses import dataclass
 from pathlib import Path
+from collections import defaultdict
+from functools import lru_cache
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
 
 try:
     import PyPDF2
-    PDF_AVAILABLE = True
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+PDF_AVAILABLE = PDFIUM_AVAILABLE or PYPDF2_AVAILABLE
+if not PDF_AVAILABLE:
+    print("pypdfium2/PyPDF2 not available - will work with text files instead")
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+try:
+    import marisa_trie
+    MARISA_AVAILABLE = True
 except ImportError:
-    print("PyPDF2 not available - will work with text files instead")
-    PDF_AVAILABLE = False
+    MARISA_AVAILABLE = False
+
+try:
+    # Cython build of the Aho-Corasick scan loops (cythonize -i _scan.pyx)
+    from _scan import scan_report, scan_reports
+    COMPILED_SCAN_AVAILABLE = True
+except ImportError:
+    COMPILED_SCAN_AVAILABLE = False
+
+# Inflections accepted after a dictionary term
+TERM_SUFFIXES = ('s', 'es', 'ies')
+LOCATION_SUFFIXES = ('al', 'ic', 'ine', 'ar')
+
+def _is_word_char(char: str) -> bool:
+    """Same notion of a word character as the regex \\w class"""
+    return char.isalnum() or char == '_'
+
+def _ascii_word_class(error):
+    """Encoding error handler that keeps the word/non-word class of non-ASCII characters
+    
+    Hyperscan's \\b only knows ASCII word characters. Replacing each
+    non-ASCII character with 'x' or ' ' keeps word boundaries where re puts
+    them, and one byte per character.
+    """
+    chunk = error.object[error.start:error.end]
+    return ''.join('x' if _is_word_char(char) else ' ' for char in chunk), error.end
+
+codecs.register_error('ascii_word_class', _ascii_word_class)
+
+def _fold_lower(text: str) -> str:
+    """Lowercase text for the dictionary lookups
+    
+    PDFs often set "Barrett’s" with a curly apostrophe, which would not match
+    "barrett's"; it is folded to ASCII. Only non-ASCII text needs the pass.
+    """
+    text_lower = text.lower()
+    if text_lower.isascii():
+        return text_lower
+    return text_lower.replace('\u2019', "'")
+
+# Medical terminology dictionaries, shared by every extractor instance
+
+# Gastrointestinal conditions and findings
+MEDICAL_TERMS = (
+    'diverticulosis', 'diverticulitis', 'hemorrhoids', 'polyp', 'polyps',
+    'colitis', 'proctitis', 'gastritis', 'esophagitis', 'duodenitis',
+    'bleeding', 'ulcer', 'ulceration', 'inflammation', 'stricture',
+    'obstruction', 'perforation', 'fissure', 'fistula', 'abscess',
+    "barrett's esophagus", 'reflux', 'gerd', 'ibd', "crohn's disease",
+    'ulcerative colitis', 'celiac disease', 'gastroenteritis',
+    'adenoma', 'adenomatous', 'hyperplastic', 'sessile', 'pedunculated',
+    'erosion', 'erythema', 'friability', 'nodular', 'villous',
+    'tubular', 'serrated', 'dysplasia', 'metaplasia', 'neoplasia'
+)
+
+# Procedures
+PROCEDURES = (
+    'colonoscopy', 'endoscopy', 'egd', 'sigmoidoscopy', 'biopsy',
+    'polypectomy', 'cauterization', 'ablation', 'dilation',
+    'sclerotherapy', 'injection', 'clipping', 'argon plasma coagulation',
+    'band ligation', 'thermal therapy', 'cryotherapy',
+    'esophagogastroduodenoscopy', 'upper endoscopy', 'lower endoscopy',
+    'endoscopic mucosal resection', 'emr', 'esd', 'hemostasis'
+)
+
+# Symptoms
+SYMPTOMS = (
+    'bleeding', 'pain', 'cramping', 'nausea', 'vomiting', 'diarrhea',
+    'constipation', 'bloating', 'distension', 'melena', 'hematochezia',
+    'hematemesis', 'dysphagia', 'odynophagia', 'heartburn', 'reflux',
+    'indigestion', 'anorexia', 'weight loss', 'fatigue', 'weakness',
+    'abdominal pain', 'rectal bleeding', 'change in bowel habits'
+)
+
+# Anatomical locations
+ANATOMICAL_LOCATIONS = (
+    'esophagus', 'stomach', 'duodenum', 'jejunum', 'ileum', 'cecum',
+    'ascending colon', 'transverse colon', 'descending colon', 'sigmoid colon',
+    'rectum', 'anus', 'anal canal', 'gastroesophageal junction', 'pylorus',
+    'antrum', 'fundus', 'cardia', 'terminal ileum', 'ileocecal valve',
+    'appendix', 'liver', 'gallbladder', 'pancreas', 'spleen', 'peritoneum',
+    'mucosa', 'submucosa', 'muscularis', 'serosa', 'lumen', 'wall',
+    'distal', 'proximal', 'sigmoid', 'cecal', 'hepatic flexure', 'splenic flexure'
+)
+
+def _canonical_terms(terms) -> tuple:
+    """Lowercase, deduplicate and intern dictionary terms, keeping their order
+    
+    The scanners report these strings as they are, so every result shares
+    one object per term and matched text never needs lowercasing.
+    """
+    return tuple(dict.fromkeys(sys.intern(term.lower()) for term in terms))
+
+@lru_cache(maxsize=None)
+def _build_term_automaton(dictionaries: tuple):
+    """Build one Aho-Corasick automaton over all dictionary terms
+    
+    Every term is added together with its suffixed variants. A value
+    holds the key length and the (category, term) pairs it stands for.
+    """
+    entries = defaultdict(set)
+    for category, terms, suffixes in dictionaries:
+        for term in terms:
+            for suffix in ('',) + suffixes:
+                entries[term + suffix].add((category, term))
+    
+    automaton = ahocorasick.Automaton()
+    for surface, surface_entries in entries.items():
+        automaton.add_word(surface, (len(surface), tuple(surface_entries)))
+    automaton.make_automaton()
+    return automaton
+
+@lru_cache(maxsize=None)
+def _build_term_database(dictionaries: tuple):
+    """Compile every dictionary term into one Hyperscan database
+    
+    Returns the database and the (category, term) pair for each pattern id.
+    """
+    db_entries = []
+    expressions = []
+    for category, terms, suffixes in dictionaries:
+        suffix_group = '(?:' + '|'.join(suffixes) + ')?'
+        for term in terms:
+            db_entries.append((category, term))
+            expressions.append((r'\b' + re.escape(term) + suffix_group + r'\b').encode())
+    
+    database = hyperscan.Database()
+    database.compile(
+        expressions=expressions,
+        ids=list(range(len(expressions))),
+        elements=len(expressions),
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions)
+    )
+    return database, db_entries
+
+@lru_cache(maxsize=None)
+def _build_term_trie(dictionaries: tuple):
+    """Build a marisa trie over the surface forms of every dictionary
+    
+    Returns the trie, the (category, term) pairs for each surface and the
+    longest surface length. Multi-word surfaces are single keys, so one
+    prefix lookup per word start finds them along with their leading words.
+    """
+    surfaces = defaultdict(set)
+    for category, terms, suffixes in dictionaries:
+        for term in terms:
+            for suffix in ('',) + suffixes:
+                surfaces[term + suffix].add((category, term))
+    
+    surfaces = {surface: tuple(entries) for surface, entries in surfaces.items()}
+    return marisa_trie.Trie(surfaces), surfaces, max(map(len, surfaces))
+
+@lru_cache(maxsize=None)
+def _build_term_regex(dictionaries: tuple):
+    """Build the pure Python term matcher
+    
+    Single-word surfaces are kept in a dict and matched by intersecting it
+    with the set of word tokens in the text. Multi-word surfaces go into one
+    alternation inside a lookahead, so every word start is tried and nested
+    phrases are all found. Only the longest phrase matches at a given
+    start, so each phrase also carries the (category, term) pairs of its
+    shorter whole-word phrase prefixes.
+    
+    Returns (word surfaces, phrase regex, phrase surfaces).
+    """
+    surfaces = defaultdict(set)
+    for category, terms, suffixes in dictionaries:
+        for term in terms:
+            for suffix in ('',) + suffixes:
+                surfaces[term + suffix].add((category, term))
+    
+    words = {}
+    phrases = {}
+    for surface, surface_entries in surfaces.items():
+        if all(map(_is_word_char, surface)):
+            words[surface] = tuple(surface_entries)
+        else:
+            phrases[surface] = surface_entries
+    
+    closed = {}
+    for surface, surface_entries in phrases.items():
+        entries = set(surface_entries)
+        for i in range(1, len(surface)):
+            if not _is_word_char(surface[i]) and surface[:i] in phrases:
+                entries.update(phrases[surface[:i]])
+        closed[surface] = tuple(entries)
+    
+    alternation = '|'.join(re.escape(surface) for surface in sorted(phrases, key=len, reverse=True)) or '(?!)'
+    return words, re.compile(r'\b(?=(' + alternation + r')\b)'), closed
 
 @dataclass
 class ClinicalReport:
@@ -34,75 +256,236 @@ class ClinicalReport:
 class SimpleClinicalExtractor:
     """Simplified clinical extractor using regex and dictionaries only"""
     
-    def __init__(self):
+    def __init__(self, threads: int = 1):
+        self.threads = threads  # worker processes for per-report extraction
         self._load_medical_dictionaries()
         self._compile_patterns()
     
+    def __getstate__(self):
+        """Pickle the extractor without its term scanners
+        
+        Worker processes get their copy of the extractor this way. A Hyperscan
+        database cannot be pickled, so the scanners are rebuilt on unpickling,
+        which is cached per process.
+        """
+        state = self.__dict__.copy()
+        for name in ('_term_ac', '_term_db', '_term_db_entries', '_term_trie',
+                     '_word_start_re', '_term_matcher', '_word_re'):
+            state.pop(name, None)
+        state['_last_scan'] = (None, None)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compile_term_scanners()
+    
     def _load_medical_dictionaries(self):
-        """Load comprehensive medical terminology dictionaries"""
-        
-        # Gastrointestinal conditions and findings
-        self.medical_terms = [
-            'diverticulosis', 'diverticulitis', 'hemorrhoids', 'polyp', 'polyps',
-            'colitis', 'proctitis', 'gastritis', 'esophagitis', 'duodenitis',
-            'bleeding', 'ulcer', 'ulceration', 'inflammation', 'stricture',
-            'obstruction', 'perforation', 'fissure', 'fistula', 'abscess',
-            "barrett's esophagus", 'reflux', 'gerd', 'ibd', "crohn's disease",
-            'ulcerative colitis', 'celiac disease', 'gastroenteritis',
-            'adenoma', 'adenomatous', 'hyperplastic', 'sessile', 'pedunculated',
-            'erosion', 'erythema', 'friability', 'nodular', 'villous',
-            'tubular', 'serrated', 'dysplasia', 'metaplasia', 'neoplasia'
-        ]
-        
-        # Procedures
-        self.procedures = [
-            'colonoscopy', 'endoscopy', 'egd', 'sigmoidoscopy', 'biopsy',
-            'polypectomy', 'cauterization', 'ablation', 'dilation',
-            'sclerotherapy', 'injection', 'clipping', 'argon plasma coagulation',
-            'band ligation', 'thermal therapy', 'cryotherapy',
-            'esophagogastroduodenoscopy', 'upper endoscopy', 'lower endoscopy',
-            'endoscopic mucosal resection', 'emr', 'esd', 'hemostasis'
-        ]
+        """Bind the medical terminology dictionaries
+        
+        The dictionaries are module-level tuples and the scanners are built
+        once per set of dictionaries, so creating further extractors is cheap.
+        """
+        self.medical_terms = MEDICAL_TERMS
+        self.procedures = PROCEDURES
+        self.symptoms = SYMPTOMS
+        self.anatomical_locations = ANATOMICAL_LOCATIONS
+        self._last_scan = (None, None)
+    
+    def _term_dictionaries(self) -> tuple:
+        """Return (category, terms, suffixes) for every dictionary scanned for terms"""
+        return (
+            ('clinical', _canonical_terms(tuple(self.medical_terms) + tuple(self.symptoms)), TERM_SUFFIXES),
+            ('anatomical', _canonical_terms(self.anatomical_locations), LOCATION_SUFFIXES)
+        )
+    
+    def _scan_terms(self, text_lower: str) -> Dict[str, Set[str]]:
+        """Find whole-word dictionary terms in the lowercased text, grouped by category
+        
+        The result for the most recent string is kept, so the extractors that
+        process_report calls with the same ``text_lower`` share a single scan.
+        """
+        last_text, last_hits = self._last_scan
+        if text_lower is last_text:
+            return last_hits
+        
+        if self._term_db is not None:
+            hits = self._scan_terms_hyperscan(text_lower)
+        elif self._term_ac is not None:
+            hits = self._scan_terms_ac(text_lower)
+        elif self._term_trie is not None:
+            hits = self._scan_terms_trie(text_lower)
+        else:
+            hits = self._scan_terms_re(text_lower)
+        self._last_scan = (text_lower, hits)
+        return hits
+    
+    def _scan_terms_ac(self, text_lower: str) -> Dict[str, Set[str]]:
+        """Scan with the Aho-Corasick automaton in a single pass"""
+        if COMPILED_SCAN_AVAILABLE:
+            return scan_report(text_lower, self._term_ac)
+        
+        hits = defaultdict(set)
+        last = len(text_lower) - 1
+        for end, (length, entries) in self._term_ac.iter(text_lower):
+            start = end - length + 1
+            # Enforce word boundaries on both sides of the hit
+            if start > 0 and _is_word_char(text_lower[start - 1]):
+                continue
+            if end < last and _is_word_char(text_lower[end + 1]):
+                continue
+            for category, term in entries:
+                hits[category].add(term)
+        return hits
+    
+    def _scan_reports_ac(self, reports_lower: List[str]) -> List[Dict[str, Set[str]]]:
+        """Scan several lowercased reports with one automaton pass over all of them
+        
+        The reports are joined with newlines, which are never part of a term,
+        and each hit is assigned to its report by its start offset.
+        """
+        if COMPILED_SCAN_AVAILABLE:
+            return scan_reports(reports_lower, self._term_ac)
+        
+        starts = [0]
+        for report_lower in reports_lower[:-1]:
+            starts.append(starts[-1] + len(report_lower) + 1)
+        corpus = "\n".join(reports_lower)
+        
+        report_hits = [defaultdict(set) for _ in reports_lower]
+        last = len(corpus) - 1
+        for end, (length, entries) in self._term_ac.iter(corpus):
+            start = end - length + 1
+            # Enforce word boundaries on both sides of the hit
+            if start > 0 and _is_word_char(corpus[start - 1]):
+                continue
+            if end < last and _is_word_char(corpus[end + 1]):
+                continue
+            hits = report_hits[bisect_right(starts, start) - 1]
+            for category, term in entries:
+                hits[category].add(term)
+        return report_hits
+    
+    def _scan_terms_hyperscan(self, text_lower: str) -> Dict[str, Set[str]]:
+        """Scan with the Hyperscan database in a single pass"""
+        hits = defaultdict(set)
         
-        # Symptoms
-        self.symptoms = [
-            'bleeding', 'pain', 'cramping', 'nausea', 'vomiting', 'diarrhea',
-            'constipation', 'bloating', 'distension', 'melena', 'hematochezia',
-            'hematemesis', 'dysphagia', 'odynophagia', 'heartburn', 'reflux',
-            'indigestion', 'anorexia', 'weight loss', 'fatigue', 'weakness',
-            'abdominal pain', 'rectal bleeding', 'change in bowel habits'
-        ]
+        def on_match(term_id, start, end, flags, context):
+            category, term = self._term_db_entries[term_id]
+            hits[category].add(term)
         
-        # Anatomical locations
-        self.anatomical_locations = [
-            'esophagus', 'stomach', 'duodenum', 'jejunum', 'ileum', 'cecum',
-            'ascending colon', 'transverse colon', 'descending colon', 'sigmoid colon',
-            'rectum', 'anus', 'anal canal', 'gastroesophageal junction', 'pylorus',
-            'antrum', 'fundus', 'cardia', 'terminal ileum', 'ileocecal valve',
-            'appendix', 'liver', 'gallbladder', 'pancreas', 'spleen', 'peritoneum',
-            'mucosa', 'submucosa', 'muscularis', 'serosa', 'lumen', 'wall',
-            'distal', 'proximal', 'sigmoid', 'cecal', 'hepatic flexure', 'splenic flexure'
-        ]
+        self._term_db.scan(text_lower.encode('ascii', 'ascii_word_class'), match_event_handler=on_match)
+        return hits
+    
+    def _scan_terms_trie(self, text_lower: str) -> Dict[str, Set[str]]:
+        """Look up the surfaces starting at every word start in the marisa trie"""
+        hits = defaultdict(set)
+        trie, surfaces, max_len = self._term_trie
+        last = len(text_lower)
+        for match in self._word_start_re.finditer(text_lower):
+            start = match.start()
+            for surface in trie.prefixes(text_lower[start:start + max_len]):
+                end = start + len(surface)
+                # Whole words only
+                if end < last and _is_word_char(text_lower[end]):
+                    continue
+                for category, term in surfaces[surface]:
+                    hits[category].add(term)
+        return hits
+    
+    def _scan_terms_re(self, text_lower: str) -> Dict[str, Set[str]]:
+        """Match word tokens by set intersection and phrases with the precompiled alternation"""
+        hits = defaultdict(set)
+        words, phrase_re, phrases = self._term_matcher
+        tokens = set(self._word_re.findall(text_lower))
+        for surface in words.keys() & tokens:
+            for category, term in words[surface]:
+                hits[category].add(term)
+        for surface in set(phrase_re.findall(text_lower)):
+            for category, term in phrases[surface]:
+                hits[category].add(term)
+        return hits
     
     def _compile_patterns(self):
         """Compile regex patterns for medical codes and sections"""
         
         # Medical code patterns
         self.icd10_pattern = re.compile(r'\b[A-Z]\d{2}(?:\.\d{1,2}[A-Z]?)?\b')
-        self.cpt_pattern = re.compile(r'\b\d{5}\b')
+        self.cpt_pattern = re.compile(r'\b[1-9]\d{4}\b')  # 10000-99999 (no leading zero)
         self.hcpcs_pattern = re.compile(r'\b[A-Z]\d{4}\b')
-        self.modifier_pattern = re.compile(r'\b(?:modifier\s+)?([A-Z]{2}|\d{2})\b', re.IGNORECASE)
+        self.modifier_pattern = re.compile(r'\bmodifiers?:?\s+([A-Z0-9]{2})\b', re.IGNORECASE)  # only after "modifier"
+        
+        # All of the above in one pass, one named group per code type. Only the
+        # modifier branch ignores case, as in the individual patterns
+        self._codes_re = re.compile(
+            r'\b(?:(?P<icd_10>[A-Z]\d{2}(?:\.\d{1,2}[A-Z]?)?)'
+            r'|(?P<cpt>[1-9]\d{4})'
+            r'|(?P<hcpcs>[A-Z]\d{4})'
+            r'|(?i:modifiers?:?\s+(?P<modifiers>[A-Z0-9]{2})))\b'
+        )
         
-        # Section patterns
+        # Section patterns. A section runs up to a blank line or the next heading;
+        # lines are consumed one at a time with a lookahead, avoiding lazy .*?
+        # backtracking
         self.diagnosis_patterns = [
-            re.compile(r'(?:diagnosis|impression|findings?):\s*(.*?)(?:\n\n|\nPROCEDURE|\nRECOMMENDATIONS?|\nPLAN|\Z)', re.IGNORECASE | re.DOTALL),
-            re.compile(r'(?:primary|secondary|final)\s+diagnosis:\s*(.*?)(?:\n\n|\n[A-Z]+:|\Z)', re.IGNORECASE | re.DOTALL)
+            re.compile(r'(?:diagnosis|impression|findings?):\s*((?:[^\n]+|\n(?!\n|PROCEDURE|RECOMMENDATIONS?|PLAN))*)', re.IGNORECASE),
+            re.compile(r'(?:primary|secondary|final)\s+diagnosis:\s*((?:[^\n]+|\n(?!\n|[A-Z]+:))*)', re.IGNORECASE)
         ]
         
         self.procedure_patterns = [
-            re.compile(r'(?:procedure|procedure\s+performed):\s*(.*?)(?:\n\n|\nDIAGNOSIS|\nFINDINGS?|\nIMPRESSION|\Z)', re.IGNORECASE | re.DOTALL),
-            re.compile(r'(?:endoscopic|surgical)\s+procedure:\s*(.*?)(?:\n\n|\n[A-Z]+:|\Z)', re.IGNORECASE | re.DOTALL)
+            re.compile(r'(?:procedure|procedure\s+performed):\s*((?:[^\n]+|\n(?!\n|DIAGNOSIS|FINDINGS?|IMPRESSION))*)', re.IGNORECASE),
+            re.compile(r'(?:endoscopic|surgical)\s+procedure:\s*((?:[^\n]+|\n(?!\n|[A-Z]+:))*)', re.IGNORECASE)
         ]
+        
+        # Fallback diagnosis patterns, one per keyword. The section ends before a
+        # blank line or the next heading, which is consumed so findall resumes
+        # after it
+        diagnosis_keywords = ['diagnosis:', 'impression:', 'findings:', 'conclusion:']
+        self.diagnosis_keyword_patterns = [
+            re.compile(rf'{keyword}\s*((?:[^\n]+|\n(?!\n|[A-Z]+:))*)(?:\n[A-Z]+:|\n\n)?', re.IGNORECASE)
+            for keyword in diagnosis_keywords
+        ]
+        
+        # Report separators in priority order. Each one starts at a newline, so
+        # they are combined behind a single \n and probed with a lookahead at
+        # every line break; the named group tells which separator matched
+        separators = [
+            r'\s*Report\s+\d+',
+            r'\s*REPORT\s+\d+',
+            r'\s*Case\s+\d+',
+            r'\s*Patient\s+\d+',
+            r'\s*Date:.*?\n.*?Name:',
+            r'\s*\d+\.\s*(?:Patient|Report)',
+            r'\s*-{3,}\s*\n',
+            r'\s*={3,}\s*\n'
+        ]
+        self._separator_re = re.compile(
+            r'\n(?=' + '|'.join(f'(?P<sep{i}>{pattern})' for i, pattern in enumerate(separators)) + ')',
+            re.IGNORECASE
+        )
+        self._blank_triple = re.compile(r'\n\s*\n\s*\n')
+        
+        self._compile_term_scanners()
+    
+    def _compile_term_scanners(self):
+        """Bind the fastest available scanner for the dictionary terms
+        
+        Hyperscan scans about 4x faster than Aho-Corasick, even with the
+        compiled scan loop. Codes stay on re: Hyperscan has no capture groups
+        and reports every match end, not leftmost-longest matches.
+        """
+        self._term_db = None
+        self._term_ac = None
+        self._term_trie = None
+        if HYPERSCAN_AVAILABLE:
+            self._term_db, self._term_db_entries = _build_term_database(self._term_dictionaries())
+        elif AHOCORASICK_AVAILABLE:
+            self._term_ac = _build_term_automaton(self._term_dictionaries())
+        elif MARISA_AVAILABLE:
+            self._term_trie = _build_term_trie(self._term_dictionaries())
+            self._word_start_re = re.compile(r'\b\w')
+        else:
+            self._term_matcher = _build_term_regex(self._term_dictionaries())
+            self._word_re = re.compile(r'\w+')
     
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text from PDF file"""
@@ -110,36 +493,67 @@ class SimpleClinicalExtractor:
             return ""
         
         try:
-            text = ""
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text
+            # Pages are streamed into a single join; repeated += is quadratic
+            if PDFIUM_AVAILABLE:
+                try:
+                    return "".join(self._iter_pages_pdfium(pdf_path))
+                except Exception as e:
+                    if not PYPDF2_AVAILABLE:
+                        raise
+                    print(f"PDFium could not read PDF, falling back to PyPDF2: {e}")
+            return "".join(self._iter_pages_pypdf2(pdf_path))
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
             return ""
     
+    def _iter_pages_pdfium(self, pdf_path: str) -> Iterator[str]:
+        """Yield the text of each page with PDFium, each followed by a newline
+        
+        PDFium is much faster than PyPDF2 on large files. Its text is not the
+        same as PyPDF2's: line breaks are kept and ligatures such as "ﬁ" are
+        expanded, so section and diagnosis boundaries can differ.
+        """
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            for page in pdf:
+                text_page = page.get_textpage()
+                # PDFium ends lines with \r\n; the extractors expect \n
+                yield text_page.get_text_range().replace("\r\n", "\n")
+                yield "\n"
+                text_page.close()
+                page.close()
+        finally:
+            pdf.close()
+    
+    def _iter_pages_pypdf2(self, pdf_path: str) -> Iterator[str]:
+        """Yield the text of each page with PyPDF2, each followed by a newline"""
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for page in pdf_reader.pages:
+                yield page.extract_text()
+                yield "\n"
+    
     def split_reports(self, text: str) -> List[str]:
         """Split text into individual reports"""
-        separators = [
-            r'\n\s*Report\s+\d+',
-            r'\n\s*REPORT\s+\d+', 
-            r'\n\s*Case\s+\d+',
-            r'\n\s*Patient\s+\d+',
-            r'\n\s*Date:.*?\n.*?Name:',
-            r'\n\s*\d+\.\s*(?:Patient|Report)',
-            r'\n\s*-{3,}\s*\n',
-            r'\n\s*={3,}\s*\n'
-        ]
-        
-        for pattern in separators:
-            reports = re.split(pattern, text, flags=re.IGNORECASE)
-            if len(reports) > 1:
-                return [report.strip() for report in reports if report.strip()]
+        # Find every separator in one pass, grouped by separator type
+        hits = defaultdict(list)
+        for match in self._separator_re.finditer(text):
+            hits[match.lastgroup].append((match.start(), match.end(match.lastgroup)))
+        
+        if hits:
+            # The highest-priority separator present wins, as if each were tried in turn
+            separator = min(hits, key=self._separator_re.groupindex.get)
+            reports = []
+            last_end = 0
+            for start, end in hits[separator]:
+                if start >= last_end:  # Skip overlapping hits, as re.split would
+                    reports.append(text[last_end:start])
+                    last_end = end
+            reports.append(text[last_end:])
+            return [report.strip() for report in reports if report.strip()]
         
         # Fallback: split by large gaps or assume single report
-        reports = re.split(r'\n\s*\n\s*\n', text)
+        reports = self._blank_triple.split(text)
         if len(reports) >= 4:
             return [report.strip() for report in reports if report.strip()]
         
@@ -147,66 +561,35 @@ class SimpleClinicalExtractor:
     
     def extract_medical_codes(self, text: str) -> Dict[str, List[str]]:
         """Extract ICD-10, CPT, HCPCS codes and modifiers"""
-        codes = {
-            'icd_10': [],
-            'cpt': [],
-            'hcpcs': [],
-            'modifiers': []
+        buckets = {
+            'icd_10': set(),
+            'cpt': set(),
+            'hcpcs': set(),
+            'modifiers': set()
         }
         
-        # Extract ICD-10 codes
-        icd10_matches = self.icd10_pattern.findall(text)
-        codes['icd_10'] = list(set(icd10_matches))
-        
-        # Extract CPT codes (filter valid range)
-        cpt_matches = self.cpt_pattern.findall(text)
-        valid_cpt = [code for code in cpt_matches if 10000 <= int(code) <= 99999]
-        codes['cpt'] = list(set(valid_cpt))
+        # Single pass over the text; the named group says which code type matched
+        for match in self._codes_re.finditer(text):
+            buckets[match.lastgroup].add(match.group(match.lastgroup))
         
-        # Extract HCPCS codes
-        hcpcs_matches = self.hcpcs_pattern.findall(text)
-        codes['hcpcs'] = list(set(hcpcs_matches))
-        
-        # Extract modifiers
-        modifier_matches = self.modifier_pattern.findall(text)
-        codes['modifiers'] = list(set(modifier_matches))
-        
-        return codes
+        return {code_type: sorted(found) for code_type, found in buckets.items()}
     
-    def extract_clinical_terms(self, text: str) -> List[str]:
-        """Extract clinical terms using pattern matching"""
-        clinical_terms = set()
-        text_lower = text.lower()
-        
-        # Find all medical terms
-        all_terms = self.medical_terms + self.symptoms
-        for term in all_terms:
-            if term in text_lower:
-                clinical_terms.add(term)
-            
-            # Check variations (plural, etc.)
-            pattern = re.compile(r'\b' + re.escape(term) + r'(?:s|es|ies)?\b', re.IGNORECASE)
-            matches = pattern.findall(text)
-            clinical_terms.update([match.lower() for match in matches])
-        
-        return list(clinical_terms)
+    def extract_clinical_terms(self, text: str, text_lower: Optional[str] = None) -> List[str]:
+        """Extract clinical terms using pattern matching
+        
+        Terms match as whole words, optionally pluralized, and are reported
+        as the dictionary term. ``text_lower`` is ``_fold_lower(text)`` if the
+        caller already has it.
+        """
+        if text_lower is None:
+            text_lower = _fold_lower(text)
+        return list(self._scan_terms(text_lower)['clinical'])
     
-    def extract_anatomical_locations(self, text: str) -> List[str]:
+    def extract_anatomical_locations(self, text: str, text_lower: Optional[str] = None) -> List[str]:
         """Extract anatomical locations"""
-        locations = set()
-        text_lower = text.lower()
-        
-        for location in self.anatomical_locations:
-            if location in text_lower:
-                locations.add(location)
-            
-            # Check for variations
-            pattern = re.compile(r'\b' + re.escape(location) + r'(?:al|ic|ine|ar)?\b', re.IGNORECASE)
-            matches = pattern.findall(text)
-            if matches:
-                locations.add(location)
-        
-        return list(locations)
+        if text_lower is None:
+            text_lower = _fold_lower(text)
+        return list(self._scan_terms(text_lower)['anatomical'])
     
     def extract_diagnosis(self, text: str) -> List[str]:
         """Extract diagnosis information"""
@@ -227,9 +610,7 @@ class SimpleClinicalExtractor:
         
         # If no structured diagnosis found, look for common patterns
         if not diagnoses:
-            diagnosis_keywords = ['diagnosis:', 'impression:', 'findings:', 'conclusion:']
-            for keyword in diagnosis_keywords:
-                pattern = re.compile(rf'{keyword}\s*(.*?)(?:\n[A-Z]+:|\n\n|\Z)', re.IGNORECASE | re.DOTALL)
+            for pattern in self.diagnosis_keyword_patterns:
                 matches = pattern.findall(text)
                 for match in matches:
                     cleaned = re.sub(r'\s+', ' ', match.strip())
@@ -238,7 +619,7 @@ class SimpleClinicalExtractor:
         
         return list(set(diagnoses))
     
-    def extract_procedures(self, text: str) -> List[str]:
+    def extract_procedures(self, text: str, text_lower: Optional[str] = None) -> List[str]:
         """Extract procedure information"""
         procedures = []
         
@@ -251,21 +632,29 @@ class SimpleClinicalExtractor:
                     procedures.append(procedure_text)
         
         # Also extract known procedures from text
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = _fold_lower(text)
         for procedure in self.procedures:
             if procedure in text_lower:
                 procedures.append(procedure)
         
         return list(set(procedures))
     
-    def process_report(self, report_text: str, report_id: str) -> ClinicalReport:
-        """Process a single report and extract all information"""
+    def process_report(self, report_text: str, report_id: str, text_lower: Optional[str] = None) -> ClinicalReport:
+        """Process a single report and extract all information
+        
+        ``text_lower`` is ``_fold_lower(report_text)`` if the caller already has it.
+        """
         
         codes = self.extract_medical_codes(report_text)
-        clinical_terms = self.extract_clinical_terms(report_text)
-        anatomical_locations = self.extract_anatomical_locations(report_text)
+        
+        # Lowercase the report only once for the dictionary lookups
+        if text_lower is None:
+            text_lower = _fold_lower(report_text)
+        clinical_terms = self.extract_clinical_terms(report_text, text_lower)
+        anatomical_locations = self.extract_anatomical_locations(report_text, text_lower)
         diagnosis = self.extract_diagnosis(report_text)
-        procedures = self.extract_procedures(report_text)
+        procedures = self.extract_procedures(report_text, text_lower)
         
         return ClinicalReport(
             report_id=report_id,
@@ -295,34 +684,76 @@ class SimpleClinicalExtractor:
         reports = self.split_reports(full_text)
         print(f"Found {len(reports)} reports")
         
-        results = []
-        for i, report_text in enumerate(reports):
-            report_id = f"Report {i+1}"
+        report_ids = [f"Report {i+1}" for i in range(len(reports))]
+        
+        # Reports are independent, so they can be extracted in worker processes.
+        # Each worker gets a copy of this extractor, configuration included
+        parallel = self.threads > 1 and len(reports) > 1
+        pool_context = (ProcessPoolExecutor(max_workers=min(self.threads, len(reports)),
+                                            initializer=_init_worker, initargs=(self,))
+                        if parallel else nullcontext())
+        with pool_context as pool:
+            if pool is not None:
+                futures = [pool.submit(_process_report, report_text, report_id)
+                           for report_text, report_id in zip(reports, report_ids)]
+            elif self._term_ac is not None:
+                # Serially, the automaton scans the whole document once for all reports
+                reports_lower = [_fold_lower(report_text) for report_text in reports]
+                report_hits = self._scan_reports_ac(reports_lower)
             
-            try:
-                clinical_report = self.process_report(report_text, report_id)
+            results = []
+            for i, report_text in enumerate(reports):
+                report_id = report_ids[i]
                 
-                result = {
-                    "ReportID": clinical_report.report_id,
-                    "Clinical Terms": clinical_report.clinical_terms,
-                    "Anatomical Locations": clinical_report.anatomical_locations,
-                    "Diagnosis": clinical_report.diagnosis,
-                    "Procedures": clinical_report.procedures,
-                    "ICD-10": clinical_report.icd_10,
-                    "CPT": clinical_report.cpt,
-                    "HCPCS": clinical_report.hcpcs,
-                    "Modifiers": clinical_report.modifiers
-                }
+                try:
+                    if pool is not None:
+                        try:
+                            clinical_report = futures[i].result()
+                        except BrokenProcessPool as e:
+                            # A worker died, at start-up or mid-run (e.g. killed for
+                            # memory), and the pool cannot run anything else. Reports
+                            # already finished are kept; the rest are processed here
+                            print(f"Worker process failed, processing the remaining reports serially: {e}")
+                            pool = None
+                            clinical_report = self.process_report(report_text, report_id)
+                    elif parallel or self._term_ac is None:
+                        clinical_report = self.process_report(report_text, report_id)
+                    else:
+                        # Hand the report its share of the document scan through the scan memo
+                        self._last_scan = (reports_lower[i], report_hits[i])
+                        clinical_report = self.process_report(report_text, report_id, reports_lower[i])
+                    
+                    result = {
+                        "ReportID": clinical_report.report_id,
+                        "Clinical Terms": clinical_report.clinical_terms,
+                        "Anatomical Locations": clinical_report.anatomical_locations,
+                        "Diagnosis": clinical_report.diagnosis,
+                        "Procedures": clinical_report.procedures,
+                        "ICD-10": clinical_report.icd_10,
+                        "CPT": clinical_report.cpt,
+                        "HCPCS": clinical_report.hcpcs,
+                        "Modifiers": clinical_report.modifiers
+                    }
+                    
+                    results.append(result)
+                    print(f"Processed {report_id}")
                 
-                results.append(result)
-                print(f"Processed {report_id}")
-                
-            except Exception as e:
-                print(f"Error processing {report_id}: {e}")
-                continue
-        
+                except Exception as e:
+                    print(f"Error processing {report_id}: {e}")
+                    continue
         return results
 
+_worker_extractor = None
+
+def _init_worker(extractor):
+    """Keep the extractor sent to a worker process for the reports it is given"""
+    global _worker_extractor
+    _worker_extractor = extractor
+
+def _process_report(report_text: str, report_id: str) -> ClinicalReport:
+    """Process a single report in a worker process"""
+    return _worker_extractor.process_report(report_text, report_id)
+
 def main():
     """Main function to run the clinical extraction"""
     